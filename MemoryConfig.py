@@ -1,21 +1,30 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 import math
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from MemoryTracker import CacheStyle, MemoryTracker
 import ModHE
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MemoryConfig:
-    """内存模拟的配置"""
+    """内存模拟的配置（不可变，字节数在构造时计算一次）"""
     cache_style: CacheStyle = CacheStyle.NONE
     max_cache_size_mb: float = 0  # 最大缓存大小（MB）
     key_compression: bool = False
+    cache_policy: str = "lru"     # 缓存替换策略："lru"或"fifo"
+    prefetch_distance: int = 0    # 软件预取距离（内存事件数），0表示不预取
+    _max_cache_bytes: int = field(init=False, repr=False, compare=False, default=0)
+    
+    def __post_init__(self):
+        object.__setattr__(self, '_max_cache_bytes', int(self.max_cache_size_mb * 1024 * 1024))
     
     @property
     def max_cache_bytes(self):
         """将MB转换为字节"""
-        return int(self.max_cache_size_mb * 1024 * 1024)
+        return self._max_cache_bytes
 
+@functools.lru_cache(maxsize=None)
 def calculate_cache_size(logN: int, dnum: int, limbs: int, logq: int = 50, style: CacheStyle = CacheStyle.ALPHA):
     """根据缓存风格计算缓存大小"""
     N = 1 << logN
@@ -35,22 +44,68 @@ def calculate_cache_size(logN: int, dnum: int, limbs: int, logq: int = 50, style
     else:
         return 0
 
+# 并行扫描时需要从工作进程合并回主ASIC的累加器
+_ASIC_ACCUMULATORS = ("MMtime", "MAtime", "NTTtime", "Rotatetime", "multiplytime", "rankredtime",
+                      "NTT_Energy", "MM_Energy", "MA_Energy", "Auto_Energy")
+# 并行扫描时需要复制到工作进程的ASIC与跟踪器模型参数（configure之后可能被修改）
+_ASIC_PARAMS = ("F", "PE_R")
+_TRACKER_PARAMS = ("logq", "dnum", "prefetch_distance", "bandwidth", "frequency",
+                   "dram_base_latency", "cache_hit_latency", "burst_size", "max_concurrency")
+
+def _sweep_worker(args):
+    """工作进程：用独立的ASIC运行单个基准测试，返回结果和ASIC累加器增量"""
+    asic_id, asic_params, config, tracker_params, operation, N, E, l, R, r, NUM = args
+    runner = SimulationRunner(asic_id)
+    for name, value in asic_params.items():
+        setattr(runner.asic, name, value)
+    tracker = runner.configure(config)
+    for name, value in tracker_params.items():
+        setattr(tracker, name, value)
+    result = runner.run_benchmark(operation, N, E, l, R, r, NUM)
+    asic = runner.asic
+    deltas = {name: getattr(asic, name) for name in _ASIC_ACCUMULATORS}
+    # 串行运行时，剩余脏行在下一次reset_stats时写回并计入下一次运行的DRAM写入
+    return result, deltas, tracker.flush_cache()
+
 class SimulationRunner:
     """使用不同内存配置运行模拟"""
+    # 不接受inner参数的高层操作
+    _HIGH_LEVEL_OPS = frozenset(("multiply", "rescale", "rotate", "keyswitch"))
+    
     def __init__(self, asic_id=0):
         self.asic = ModHE.ASIC(asic_id)
         self.tracker = None
+        self.config = None
+        self._ops = {}  # 操作名 -> 带内存跟踪的方法，由configure构建
         self.dnum = 2  # 默认dnum参数，可配置
     
     def configure(self, config: MemoryConfig):
         """使用内存参数配置模拟"""
+        self.config = config
         self.tracker = MemoryTracker(
             self.asic, 
             cache_style=config.cache_style,
-            max_cache_size=config.max_cache_bytes
+            max_cache_size=config.max_cache_bytes,
+            cache_policy=config.cache_policy,
+            prefetch_distance=config.prefetch_distance
         )
         # 设置dnum参数
         self.tracker.dnum = self.dnum
+        
+        # 操作名 -> 带内存跟踪的方法
+        tracker = self.tracker
+        self._ops = {
+            "multiply": tracker.multiply_with_memory,
+            "rescale": tracker.rescale_with_memory,
+            "rotate": tracker.rotate_with_memory,
+            "keyswitch": tracker.keyswitch_with_memory,
+            "multiply_pe": tracker.multiply_pe_with_memory,
+            "multiply_add": tracker.multiply_add_with_memory,
+            "add_plain": tracker.add_plain_with_memory,
+            "mod_up": tracker.mod_up_with_memory,
+            "mod_down": tracker.mod_down_with_memory,
+            "ntt": tracker.ntt_with_memory,
+        }
         return self.tracker
     
     def run_benchmark(self, 
@@ -70,30 +125,13 @@ class SimulationRunner:
         if reset_stats:
             self.tracker.reset_stats()
             
-        result = 0.0  # 初始化结果为0
-            
-        if operation == "multiply":
-            result = self.tracker.multiply_with_memory(N, E, l, R, r, NUM)
-        elif operation == "rescale":
-            result = self.tracker.rescale_with_memory(N, E, l, R, r, NUM)
-        elif operation == "rotate":
-            result = self.tracker.rotate_with_memory(N, E, l, R, r, NUM)
-        elif operation == "keyswitch":
-            result = self.tracker.keyswitch_with_memory(N, E, l, R, r, NUM)
-        elif operation == "multiply_pe":
-            result = self.tracker.multiply_pe_with_memory(N, E, l, R, r, NUM, inner)
-        elif operation == "multiply_add":
-            result = self.tracker.multiply_add_with_memory(N, E, l, R, r, NUM, inner)
-        elif operation == "add_plain":
-            result = self.tracker.add_plain_with_memory(N, E, l, R, r, NUM, inner)
-        elif operation == "mod_up":
-            result = self.tracker.mod_up_with_memory(N, E, l, R, r, NUM, inner)
-        elif operation == "mod_down":
-            result = self.tracker.mod_down_with_memory(N, E, l, R, r, NUM, inner)
-        elif operation == "ntt":
-            result = self.tracker.ntt_with_memory(N, E, l, R, r, NUM, inner)
-        else:
+        fn = self._ops.get(operation)
+        if fn is None:
             raise ValueError(f"不支持的操作: {operation}")
+        if operation in self._HIGH_LEVEL_OPS:
+            result = fn(N, E, l, R, r, NUM)
+        else:
+            result = fn(N, E, l, R, r, NUM, inner)
             
         # 获取统计数据
         stats = self.tracker.get_memory_stats()
@@ -129,6 +167,55 @@ class SimulationRunner:
             "memory_stats": stats
         }
     
+    def run_sweep(self, operation: str, N: int, E: int, l_values, R: int, r: int, NUM: int = 1,
+                  workers: Optional[int] = None):
+        """对一组l值运行基准测试，返回按l值顺序逐个产出 (l, 结果) 的迭代器
+
+        参数在调用时立即检查，而不是推迟到第一次取值。
+        串行时multiply的特化只在遍历期间生效，迭代结束或关闭后self.asic恢复原状。
+        workers > 1 时用进程池并行运行，每个l值使用独立的ASIC（复制F、PE_R及跟踪器的logq、dnum
+        和延迟模型参数），其累加器增量合并回self.asic；
+        上一次运行遗留脏行的写回量按串行顺序补记，结果与串行一致。并行运行后self.tracker
+        不保留最后一次运行的缓存状态。
+        """
+        if self.tracker is None:
+            raise ValueError("在运行基准测试前配置内存跟踪")
+        if operation not in self._ops:
+            raise ValueError(f"不支持的操作: {operation}")
+        if workers is None or workers <= 1:
+            return self._sweep_serial(operation, N, E, l_values, R, r, NUM)
+        if self.config is None:
+            raise ValueError("并行扫描需要通过configure()创建内存跟踪器")
+        return self._sweep_parallel(operation, N, E, l_values, R, r, NUM, workers)
+    
+    def _sweep_serial(self, operation, N, E, l_values, R, r, NUM):
+        """run_sweep的串行实现"""
+        run = self.run_benchmark
+        with self.asic.specialized(N, E, R):
+            for l in l_values:
+                yield l, run(operation, N, E, l, R, r, NUM)
+    
+    def _sweep_parallel(self, operation, N, E, l_values, R, r, NUM, workers):
+        """run_sweep的进程池实现，工作进程复制self.asic与self.tracker的模型参数"""
+        l_values = list(l_values)
+        asic_params = {name: getattr(self.asic, name) for name in _ASIC_PARAMS}
+        tracker_params = {name: getattr(self.tracker, name) for name in _TRACKER_PARAMS}
+        tasks = [(self.asic.c_id, asic_params, self.config, tracker_params, operation, N, E, l, R, r, NUM)
+                 for l in l_values]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_sweep_worker, tasks))
+        
+        # 当前跟踪器中的脏行计入第一次运行
+        self.tracker.reset_stats()
+        pending = self.tracker.stats.dram_limb_wr
+        asic = self.asic
+        for (result, deltas, next_pending), l in zip(outcomes, l_values):
+            for name, delta in deltas.items():
+                setattr(asic, name, getattr(asic, name) + delta)
+            result["memory_stats"].dram_limb_wr += pending
+            pending = next_pending
+            yield l, result
+    
     def run_full_benchmark(self, config: MemoryConfig, N: int, E: int, l: int, R: int, r: int):
         """运行所有基准测试操作"""
         self.configure(config)
@@ -3,6 +3,7 @@ from enum import Enum
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Set
 from collections import OrderedDict
+from array import array
 import ModHE  # 导入原始ModHE模块
 
 class CacheStyle(Enum):
@@ -13,7 +14,11 @@ class CacheStyle(Enum):
     ALPHA = 3    # 用于α操作的缓存（ceil(L/dnum)大小）
     HUGE = 4     # 可以容纳密钥的大缓存（250MB+）
 
-@dataclass
+# 内存事务类型名称，MemoryStats中按下标存储为int8操作码
+_TRANSACTION_NAMES: Tuple[str, ...] = ("read_limb", "write_limb", "read_key", "read_plaintext")
+_TRANSACTION_CODES: Dict[str, int] = {name: code for code, name in enumerate(_TRANSACTION_NAMES)}
+
+@dataclass(slots=True)
 class MemoryStats:
     """跟踪内存统计信息"""
     dram_limb_rd: int = 0        # DRAM limb读取（字节）
@@ -34,7 +39,9 @@ class MemoryStats:
     computation_cycles: int = 0  # 计算周期数
     memory_cycles: int = 0       # 内存访问周期数
     
-    memory_transactions: List[Tuple[str, int]] = field(default_factory=list)
+    # 内存事务按列存储：操作码（int8）与大小（int64）
+    _tx_op: array = field(default_factory=lambda: array('b'), init=False, repr=False)
+    _tx_size: array = field(default_factory=lambda: array('q'), init=False, repr=False)
     
     @property
     def total_dram_transfers(self):
@@ -48,9 +55,19 @@ class MemoryStats:
             return 0
         return self.cache_hits / self.total_accesses
     
+    @property
+    def memory_transactions(self) -> List[Tuple[str, int]]:
+        """按记录顺序返回 (操作, 大小) 列表"""
+        names = _TRANSACTION_NAMES
+        return [(names[op], size) for op, size in zip(self._tx_op, self._tx_size)]
+    
     def record_transaction(self, operation: str, size: int):
         """记录内存事务"""
-        self.memory_transactions.append((operation, size))
+        code = _TRANSACTION_CODES.get(operation)
+        if code is None:
+            raise ValueError(f"未知的内存事务类型: {operation}")
+        self._tx_op.append(code)
+        self._tx_size.append(size)
     
     def __str__(self):
         """用于调试的字符串表示"""
@@ -66,55 +83,63 @@ class MemoryStats:
             f"内存周期: {self.memory_cycles}"
         )
 
-class CacheLine:
-    """模拟缓存行"""
-    def __init__(self, address: str, size: int):
-        self.address = address    # 缓存行地址标识符
-        self.size = size          # 缓存行大小（字节）
-        self.last_accessed = 0    # 最后访问时间戳
-        self.dirty = False        # 是否被修改过
-        
-    def access(self, timestamp: int):
-        """访问缓存行并更新时间戳"""
-        self.last_accessed = timestamp
-        
-    def mark_dirty(self):
-        """标记缓存行为脏"""
-        self.dirty = True
-        
-    def clear_dirty(self):
-        """清除脏标记"""
-        self.dirty = False
-        
-    def is_dirty(self) -> bool:
-        """检查缓存行是否为脏"""
-        return self.dirty
-
 class Cache:
-    """实现模拟缓存"""
-    def __init__(self, max_size: int, line_size: int = 4096):
+    """实现模拟缓存
+
+    缓存行状态保存在按槽位索引的并行数组中，lines只记录 {地址: 槽位} 的替换顺序（LRU或FIFO），
+    访问时不再为每个缓存行创建Python对象。reset()通过递增代数使现有缓存行惰性失效，
+    失效行在被再次访问或到达驱逐队首时才被移除。
+    """
+    POLICIES = ("lru", "fifo")
+    
+    def __init__(self, max_size: int, line_size: int = 4096, policy: str = "lru",
+                 stats: Optional[MemoryStats] = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"不支持的缓存替换策略: {policy}")
         self.max_size = max_size          # 最大缓存大小（字节）
+        self.policy = policy              # 替换策略：lru或fifo（fifo命中时不调整顺序）
+        self._lru = policy == "lru"
         self.line_size = line_size        # 缓存行大小（字节）
         self.current_size = 0             # 当前使用的缓存大小
-        self.timestamp = 0                # 当前时间戳
-        self.lines = OrderedDict()        # 缓存行映射 {地址: CacheLine}
-        self.prefetch_candidates = set()  # 预取候选地址
+        self.lines = OrderedDict()        # 缓存行映射 {地址键: 槽位}，按替换顺序排列
+        self._size = array('q')           # 槽位 -> 缓存行大小（字节）
+        self._gen = array('q')            # 槽位 -> 写入时的代数
+        self.generation = 0               # 当前代数，与之不符的缓存行视为无效
+        self._dirty: Set[int] = set()     # 脏缓存行的槽位集合
+        self._free: List[int] = []        # 空闲槽位栈
         self.burst_size = 64              # 突发传输大小（字节）
+        self.stats = stats                # 占用增长时更新其max_cache_usage
         
-    def get_timestamp(self) -> int:
-        """获取并递增时间戳"""
-        self.timestamp += 1
-        return self.timestamp
-        
-    def lookup(self, address: str, size: int) -> bool:
-        """查找地址是否在缓存中"""
-        return address in self.lines
+    def lookup(self, address: int, size: int) -> bool:
+        """查找地址是否在缓存中（且属于当前代）"""
+        slot = self.lines.get(address)
+        return slot is not None and self._gen[slot] == self.generation
     
-    def get_line_address(self, address: str) -> str:
+    def get_line_address(self, address: int) -> int:
         """获取地址对应的缓存行地址"""
         # 实际实现可能更复杂，这里简化处理
         return address
     
+    def _insert(self, address: int, size: int, dirty: bool) -> None:
+        """在空闲槽位（或新槽位）中插入缓存行"""
+        if self._free:
+            slot = self._free.pop()
+            self._size[slot] = size
+            self._gen[slot] = self.generation
+        else:
+            slot = len(self._size)
+            self._size.append(size)
+            self._gen.append(self.generation)
+        if dirty:
+            self._dirty.add(slot)
+        self.lines[address] = slot
+        self.current_size += size
+        
+        # 占用只在插入时增长，在此更新最大缓存使用量统计
+        stats = self.stats
+        if stats is not None and self.current_size > stats.max_cache_usage:
+            stats.max_cache_usage = self.current_size
+    
     def evict(self, needed_size: int) -> int:
         """驱逐缓存行以腾出空间
         
@@ -127,27 +152,38 @@ class Cache:
         if self.current_size + needed_size <= self.max_size:
             return bytes_written
             
-        # 根据LRU策略腾出空间
-        while self.current_size + needed_size > self.max_size and self.lines:
-            # 获取最早访问的缓存行地址
-            oldest_addr = next(iter(self.lines))
-            oldest_line = self.lines[oldest_addr]
+        # 按队列顺序（LRU或FIFO）腾出空间
+        lines = self.lines
+        sizes = self._size
+        dirty = self._dirty
+        gens = self._gen
+        generation = self.generation
+        while self.current_size + needed_size > self.max_size and lines:
+            # 弹出最早访问的缓存行
+            _, slot = lines.popitem(last=False)
+            
+            # 上一代遗留的失效行不占用空间，直接回收槽位
+            if gens[slot] != generation:
+                self._free.append(slot)
+                continue
+            size = sizes[slot]
             
             # 如果缓存行为脏，需要写回DRAM
-            if oldest_line.is_dirty():
-                bytes_written += oldest_line.size
+            if slot in dirty:
+                bytes_written += size
+                dirty.discard(slot)
                 
-            # 从缓存中移除该行
-            self.current_size -= oldest_line.size
-            del self.lines[oldest_addr]
+            # 释放槽位
+            self.current_size -= size
+            self._free.append(slot)
             
         return bytes_written
     
-    def access(self, address: str, size: int, is_write: bool = False) -> Tuple[bool, int]:
+    def access(self, address: int, size: int, is_write: bool = False) -> Tuple[bool, int]:
         """访问缓存
         
         参数:
-            address: 访问的地址
+            address: 访问的地址键（整数）
             size: 访问的数据大小（字节）
             is_write: 是否为写操作
             
@@ -156,127 +192,173 @@ class Cache:
         """
         if self.max_size == 0:  # 如果没有缓存
             return False, size
-            
-        line_addr = self.get_line_address(address)
-        timestamp = self.get_timestamp()
         
-        # 检查缓存命中
-        if line_addr in self.lines:
-            # 缓存命中
-            cache_line = self.lines[line_addr]
-            
-            # 更新访问时间戳，将此行移到LRU队列末尾
-            cache_line.access(timestamp)
-            self.lines.move_to_end(line_addr)
-            
-            # 如果是写操作，标记为脏
-            if is_write:
-                cache_line.mark_dirty()
-                
-            # 添加相邻地址到预取候选集
-            self.add_prefetch_candidates(address)
+        # 命中/未命中路径全部内联在此处，避免每次访问的额外方法调用
+        lines = self.lines
+        
+        # 检查缓存命中（缓存行地址即访问地址，见get_line_address）
+        slot = lines.get(address)
+        if slot is not None:
+            if self._gen[slot] == self.generation:
+                # 缓存命中：LRU策略下将此行移到队列末尾
+                if self._lru:
+                    lines.move_to_end(address)
                 
-            return True, 0
+                # 如果是写操作，标记为脏
+                if is_write:
+                    self._dirty.add(slot)
+                    
+                return True, 0
+            
+            # 上一代遗留的失效行：移除后按未命中处理
+            del lines[address]
+            self._free.append(slot)
         
         # 缓存未命中
         # 计算需要从DRAM读取的数据量（按突发大小对齐）
-        transfer_size = math.ceil(size / self.burst_size) * self.burst_size
-        
-        # 驱逐缓存行以腾出空间
-        bytes_written = self.evict(size)
+        burst = self.burst_size
+        transfer_size = (size + burst - 1) // burst * burst
         
-        # 创建新的缓存行
-        new_line = CacheLine(line_addr, size)
-        if is_write:
-            new_line.mark_dirty()
-        new_line.access(timestamp)
+        # 仅在空间不足时驱逐缓存行
+        if self.current_size + size > self.max_size:
+            bytes_written = self.evict(size)
+        else:
+            bytes_written = 0
         
         # 将新行添加到缓存
-        self.lines[line_addr] = new_line
-        self.current_size += size
-        
-        # 添加相邻地址到预取候选集
-        self.add_prefetch_candidates(address)
-        
-        # 尝试预取数据
-        prefetch_bytes = self.prefetch()
+        self._insert(address, size, is_write)
         
-        return False, transfer_size + bytes_written + prefetch_bytes
+        return False, transfer_size + bytes_written
     
-    def add_prefetch_candidates(self, address: str):
-        """添加预取候选地址"""
-        # 在实际实现中可能会基于访问模式添加相邻地址
-        # 这里简化处理
-        pass
+    def prefetch(self, address: int, size: int) -> int:
+        """将地址预取到缓存（不计为一次访问）
         
-    def prefetch(self) -> int:
-        """执行预取操作，返回预取的字节数"""
-        # 简化的预取实现
-        prefetch_bytes = 0
-        candidates_to_remove = set()
-        
-        for addr in self.prefetch_candidates:
-            if addr not in self.lines and self.current_size + self.line_size <= self.max_size:
-                # 预取此地址
-                self.lines[addr] = CacheLine(addr, self.line_size)
-                self.current_size += self.line_size
-                prefetch_bytes += self.line_size
-                candidates_to_remove.add(addr)
-                
-        # 移除已预取的候选地址
-        self.prefetch_candidates -= candidates_to_remove
+        返回:
+            DRAM传输字节数（含驱逐写回），已在缓存中或超过缓存容量时返回0
+        """
+        if size > self.max_size:
+            return 0
+        slot = self.lines.get(address)
+        if slot is not None:
+            if self._gen[slot] == self.generation:
+                return 0
+            # 上一代遗留的失效行，移除后重新预取
+            del self.lines[address]
+            self._free.append(slot)
+        
+        if self.current_size + size > self.max_size:
+            bytes_written = self.evict(size)
+        else:
+            bytes_written = 0
+        
+        self._insert(address, size, False)
         
-        return prefetch_bytes
+        burst = self.burst_size
+        return (size + burst - 1) // burst * burst + bytes_written
     
     def flush(self) -> int:
-        """刷新所有脏缓存行，返回写回DRAM的字节数"""
-        bytes_written = 0
-        lines_to_clear = []
+        """刷新所有脏缓存行，返回写回DRAM的字节数（只遍历脏行）"""
+        sizes = self._size
+        bytes_written = sum(sizes[slot] for slot in self._dirty)
         
-        for addr, line in self.lines.items():
-            if line.is_dirty():
-                bytes_written += line.size
-                lines_to_clear.append(addr)
-                
         # 清除脏标记
-        for addr in lines_to_clear:
-            self.lines[addr].clear_dirty()
+        self._dirty.clear()
             
         return bytes_written
     
+    def reset(self) -> int:
+        """开始新一代：写回脏行并使所有缓存行失效，不遍历缓存行
+        
+        返回:
+            写回DRAM的字节数
+        """
+        bytes_written = self.flush()
+        self.generation += 1
+        self.current_size = 0
+        return bytes_written
+    
     def clear(self):
         """清空缓存"""
         bytes_written = self.flush()
         self.lines.clear()
+        del self._size[:]
+        del self._gen[:]
+        self._dirty.clear()
+        self._free.clear()
         self.current_size = 0
-        self.prefetch_candidates.clear()
         return bytes_written
 
+# batch_account的内存事件操作码
+OP_READ_LIMB = 0    # 读取limbs
+OP_WRITE_LIMB = 1   # 写入limbs
+OP_READ_KEY = 2     # 读取密钥
+OP_READ_PLAIN = 3   # 读取明文
+
+# 缓存地址键的数据类型，键为 (类型 << 56) | (limbs << 32) | N
+_LIMB = 0
+_KEY = 1
+_PLAIN = 2
+_LIMBS_MASK = 0xFFFFFF    # limbs占24位，负数（如l=1时rescale的l-2）不会溢出到类型位
+_N_MASK = 0xFFFFFFFF      # N占低32位
+
+def _address_key(kind: int, N: int, limbs: int) -> int:
+    """把 (数据类型, N, limbs) 打包为缓存地址键，各字段先截断到自身位宽"""
+    return (kind << 56) | ((limbs & _LIMBS_MASK) << 32) | (N & _N_MASK)
+
+def _latency_param(name: str):
+    """DRAM延迟模型参数属性：赋值后重新特化延迟闭包，避免闭包使用过期参数"""
+    attr = "_" + name
+    
+    def fget(self):
+        return getattr(self, attr)
+    
+    def fset(self, value):
+        setattr(self, attr, value)
+        self.specialize_dram_latency()
+    
+    return property(fget, fset)
+
 class MemoryTracker:
     """ModHE的内存跟踪器"""
-    def __init__(self, asic: ModHE.ASIC, cache_style: CacheStyle = CacheStyle.NONE, max_cache_size: int = 0):
+    
+    # 延迟模型参数，修改任一项都会重建calculate_dram_access_latency
+    bandwidth = _latency_param("bandwidth")
+    frequency = _latency_param("frequency")
+    dram_base_latency = _latency_param("dram_base_latency")
+    burst_size = _latency_param("burst_size")
+    max_concurrency = _latency_param("max_concurrency")
+    
+    def __init__(self, asic: ModHE.ASIC, cache_style: CacheStyle = CacheStyle.NONE, max_cache_size: int = 0,
+                 prefetch_distance: int = 0, cache_policy: str = "lru"):
         self.asic = asic
         self.cache_style = cache_style
+        # 热路径使用的缓存风格整数标志，避免每次访问比较Enum
+        self._cstyle = cache_style.value
+        self._is_cached = self._cstyle != CacheStyle.NONE.value
+        self._is_huge = self._cstyle >= CacheStyle.HUGE.value
         self.max_cache_size = max_cache_size  # 最大缓存大小（字节）
-        
-        # 创建缓存对象
-        self.cache = Cache(max_cache_size)
+        self.prefetch_distance = prefetch_distance  # batch_account的软件预取距离（事件数），0表示不预取
         
         # 创建统计对象
         self.stats = MemoryStats(max_cache_size=max_cache_size, cache_style=cache_style)
         
+        # 创建缓存对象（由缓存维护最大缓存使用量统计）
+        self.cache = Cache(max_cache_size, policy=cache_policy, stats=self.stats)
+        
         # 根据ASIC参数计算关键属性
         self.N = 1 << asic.m_bits  # 多项式度
         self.logq = 50  # 默认使用50位
+        self._size_cache: Dict[Tuple[int, int, int], int] = {}  # {(N, limbs, logq): 字节大小}
         self.PE_R = asic.PE_R      # PE阵列维度
-        self.bandwidth = asic.BD * 10**9 / 8  # 将Gb/s转换为Bytes/s
-        self.frequency = asic.F    # 芯片频率（Hz）
+        self._bandwidth = asic.BD * 10**9 / 8  # 将Gb/s转换为Bytes/s
+        self._frequency = asic.F   # 芯片频率（Hz）
         
-        # 内存访问延迟模型参数
-        self.dram_base_latency = 45    # DRAM基本访问延迟（周期）
+        # 内存访问延迟模型参数（先写底层字段，最后统一特化一次）
+        self._dram_base_latency = 45   # DRAM基本访问延迟（周期）
         self.cache_hit_latency = 2     # 缓存命中延迟（周期）
-        self.burst_size = 64           # HBM突发传输大小（字节）
-        self.max_concurrency = 8       # 最大并发请求数
+        self._burst_size = 64          # HBM突发传输大小（字节）
+        self._max_concurrency = 8      # 最大并发请求数
+        self.specialize_dram_latency()
         
         # 跟踪当前缓存中的数据
         self.cached_data = {}  # 格式: {数据标识: 大小}
@@ -284,14 +366,18 @@ class MemoryTracker:
         
         # 将操作的时间存储在ASIC对象中
         self.asic.multiplytime = 0
-        self.asic.Rotatetime = 0
+        self.asic.reset_rotate_time()
         
     def calculate_size_in_bytes(self, N: int, limbs: int) -> int:
-        """根据N和limb数量计算字节大小"""
-        size = int(math.ceil((N * limbs * self.logq) / 8))
-        return max(size, 1024)
+        """根据N和limb数量计算字节大小（结果按(N, limbs, logq)缓存）"""
+        key = (N, limbs, self.logq)
+        size = self._size_cache.get(key)
+        if size is None:
+            size = max(int(math.ceil((N * limbs * self.logq) / 8)), 1024)
+            self._size_cache[key] = size
+        return size
     
-    def memory_access(self, address: str, size: int, is_write: bool = False) -> int:
+    def memory_access(self, address: int, size: int, is_write: bool = False) -> int:
         """模拟内存访问，返回访问延迟
         """
         # 更新访问统计
@@ -321,41 +407,43 @@ class MemoryTracker:
         
         return latency
     
-    def calculate_dram_access_latency(self, bytes_transferred: int) -> int:
-        """计算DRAM访问延迟（周期）"""
-        if bytes_transferred == 0:
-            return 0
-            
-        # 计算请求数
-        requests = math.ceil(bytes_transferred / self.burst_size)
+    def specialize_dram_latency(self):
+        """将延迟模型参数绑定到闭包中，作为实例的calculate_dram_access_latency（唯一实现）
         
-        # 计算批次数（考虑并行性）
-        batches = math.ceil(requests / self.max_concurrency)
-        
-        # 计算传输周期数
-        bytes_per_cycle = self.bandwidth / self.frequency
-        transfer_cycles = bytes_transferred / bytes_per_cycle
-        
-        # 小于1MB的传输，延迟主导；大于1MB的传输，带宽主导
-        if bytes_transferred < 1024 * 1024:
-            # 前几个请求受延迟影响较大，后续请求可以并行处理
-            latency = self.dram_base_latency + (batches - 1) * 5 + transfer_cycles * 0.2
-        else:
+        各模型参数的属性setter会自动调用本方法；计算周期换算用的频率同时更新。
+        """
+        base = self._dram_base_latency
+        burst = self._burst_size
+        concurrency = self._max_concurrency
+        frequency = self._frequency
+        bandwidth = self._bandwidth
+        self._freq = frequency  # 计算周期换算使用的频率
+        
+        def calculate_dram_access_latency(bytes_transferred: int) -> int:
+            """计算DRAM访问延迟（周期）"""
+            if bytes_transferred == 0:
+                return 0
+            # 计算传输周期数
+            transfer_cycles = bytes_transferred * frequency / bandwidth
+            # 小于1MB的传输，延迟主导：前几个请求受延迟影响较大，后续请求按并发批次处理
+            if bytes_transferred < 1048576:
+                batches = ((bytes_transferred + burst - 1) // burst + concurrency - 1) // concurrency
+                return int(base + (batches - 1) * 5 + transfer_cycles * 0.2)
             # 大数据量主要受带宽限制，但可以通过并行优化减少部分延迟
-            latency = self.dram_base_latency + transfer_cycles * 0.6
+            return int(base + transfer_cycles * 0.6)
         
-        return int(latency)
+        self.calculate_dram_access_latency = calculate_dram_access_latency
     
     def read_limb(self, N: int, limbs: int):
         """模拟从DRAM读取limbs"""
         size = self.calculate_size_in_bytes(N, limbs)
-        address = f"limb_{N}_{limbs}_{id(self)}"
+        address = _address_key(_LIMB, N, limbs)
         
         # 记录读取事务
         self.stats.record_transaction("read_limb", size)
         
         # 如果是NONE缓存风格，直接从DRAM读取
-        if self.cache_style == CacheStyle.NONE:
+        if not self._is_cached:
             self.stats.dram_limb_rd += size
             latency = self.calculate_dram_access_latency(size)
             self.stats.memory_cycles += latency
@@ -364,22 +452,18 @@ class MemoryTracker:
         # 其他缓存风格，尝试从缓存读取
         latency = self.memory_access(address, size, False)
         
-        # 更新最大缓存使用量统计
-        if self.cache.current_size > self.stats.max_cache_usage:
-            self.stats.max_cache_usage = self.cache.current_size
-        
         return size
     
     def write_limb(self, N: int, limbs: int):
         """模拟将limbs写入DRAM"""
         size = self.calculate_size_in_bytes(N, limbs)
-        address = f"limb_{N}_{limbs}_{id(self)}"
+        address = _address_key(_LIMB, N, limbs)
         
         # 记录写入事务
         self.stats.record_transaction("write_limb", size)
         
         # 如果是NONE缓存风格，直接写入DRAM
-        if self.cache_style == CacheStyle.NONE:
+        if not self._is_cached:
             self.stats.dram_limb_wr += size
             latency = self.calculate_dram_access_latency(size)
             self.stats.memory_cycles += latency
@@ -388,10 +472,6 @@ class MemoryTracker:
         # 其他缓存风格，尝试写入缓存
         latency = self.memory_access(address, size, True)
         
-        # 更新最大缓存使用量统计
-        if self.cache.current_size > self.stats.max_cache_usage:
-            self.stats.max_cache_usage = self.cache.current_size
-        
         return size
     
     def read_key(self, N: int, limbs: int, compressed: bool = True):
@@ -400,7 +480,7 @@ class MemoryTracker:
         if not compressed:
             size *= 2  # 未压缩的密钥大小是两倍
             
-        address = f"key_{N}_{limbs}_{id(self)}"
+        address = _address_key(_KEY, N, limbs)
         
         # 记录读取事务
         self.stats.record_transaction("read_key", size)
@@ -411,20 +491,16 @@ class MemoryTracker:
         self.stats.memory_cycles += latency
         
         # 如果不是NONE模式，尝试缓存密钥
-        if self.cache_style != CacheStyle.NONE and self.cache_style.value >= CacheStyle.HUGE.value:
+        if self._is_huge:
             # 只有HUGE缓存才尝试缓存整个密钥
             hit, _ = self.cache.access(address, size, False)
-            
-            # 更新最大缓存使用量统计
-            if self.cache.current_size > self.stats.max_cache_usage:
-                self.stats.max_cache_usage = self.cache.current_size
         
         return size
     
     def read_plaintext(self, N: int, limbs: int):
         """模拟从DRAM读取明文"""
         size = self.calculate_size_in_bytes(N, limbs)
-        address = f"plaintext_{N}_{limbs}_{id(self)}"
+        address = _address_key(_PLAIN, N, limbs)
         
         # 记录读取事务
         self.stats.record_transaction("read_plaintext", size)
@@ -435,72 +511,90 @@ class MemoryTracker:
         self.stats.memory_cycles += latency
         
         # 如果不是NONE模式，尝试缓存明文
-        if self.cache_style != CacheStyle.NONE:
+        if self._is_cached:
             hit, _ = self.cache.access(address, size, False)
-            
-            # 更新最大缓存使用量统计
-            if self.cache.current_size > self.stats.max_cache_usage:
-                self.stats.max_cache_usage = self.cache.current_size
         
         return size
     
+    def batch_account(self, ops) -> int:
+        """按顺序批量记录一组内存事件
+        
+        参数:
+            ops: (N, limbs, 操作码) 序列，操作码为OP_READ_LIMB/OP_WRITE_LIMB/OP_READ_KEY/OP_READ_PLAIN
+            
+        返回:
+            所有事件的总字节数
+        """
+        # 操作码即下标，每类事件只有read_limb等一处实现
+        handlers = (self.read_limb, self.write_limb, self.read_key, self.read_plaintext)
+        distance = self.prefetch_distance if self._is_cached else 0
+        if distance:
+            ops = tuple(ops)
+        total = 0
+        for i, (N, limbs, op) in enumerate(ops):
+            total += handlers[op](N, limbs)
+            if distance:
+                self.prefetch_ahead(ops, i + 1, distance)
+        return total
+    
+    def prefetch_ahead(self, ops, start: int, distance: int) -> int:
+        """软件预取：把ops[start:start+distance]中即将读取的limb集合预先放入缓存
+        
+        事件序列在batch_account中事先已知，预取目标就是之后真正要读取的缓冲区
+        （地址键与read_limb相同），因此预取不会引入多余的数据对象。
+        预取的数据计入DRAM读取量，但其延迟被隐藏，不计入内存周期。
+        
+        返回:
+            预取产生的DRAM传输字节数
+        """
+        cache = self.cache
+        size_of = self.calculate_size_in_bytes
+        fetched = 0
+        for N, limbs, op in ops[start:start + distance]:
+            if op == OP_READ_LIMB:
+                fetched += cache.prefetch(_address_key(_LIMB, N, limbs), size_of(N, limbs))
+        self.stats.dram_limb_rd += fetched
+        return fetched
+    
     def release_cache(self, size: int):
         """模拟释放缓存空间        """
         pass
     
     def check_cache_available(self, size: int) -> bool:
         """检查缓存是否有可用空间"""
-        if self.cache_style == CacheStyle.NONE or self.max_cache_size == 0:
+        if not self._is_cached or self.max_cache_size == 0:
             return False
         return self.cache.current_size + size <= self.max_cache_size
 
     def multiply_pe_with_memory(self, N, E, l, R, r, NUM=1, inner=1):
         """为multiply_pe添加内存跟踪"""
-        # 读取输入
-        if self.cache_style == CacheStyle.NONE:
-            self.read_limb(N, l)
-        else:
-            # 对于有缓存的情况，尝试使用缓存
-            self.read_limb(N, l)
+        # 读取输入（有缓存时read_limb会尝试使用缓存）
+        self.read_limb(N, l)
         
         # 调用原始函数获取计算时间
         result = self.asic.multiply_pe(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
-        # 如果缓存不够大，写出输出
-        if self.cache_style == CacheStyle.NONE:
-            self.write_limb(N, l)
-        else:
-            # 对于有缓存的情况，尝试使用缓存
-            self.write_limb(N, l)
+        # 写出输出（有缓存时write_limb会尝试使用缓存）
+        self.write_limb(N, l)
             
         return result
 
     def multiply_add_with_memory(self, N, E, l, R, r, NUM=1, inner=1):
         """为multiply_add添加内存跟踪"""
-        # 读取输入
-        if self.cache_style == CacheStyle.NONE:
-            self.read_limb(N, l)
-        else:
-            # 对于有缓存的情况，尝试使用缓存
-            self.read_limb(N, l)
+        # 读取输入（有缓存时read_limb会尝试使用缓存）
+        self.read_limb(N, l)
         
         # 调用原始函数获取计算时间
         result = self.asic.multiply_add(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
-        # 如果缓存不够大，写出输出
-        if self.cache_style == CacheStyle.NONE:
-            self.write_limb(N, l)
-        else:
-            # 对于有缓存的情况，尝试使用缓存
-            self.write_limb(N, l)
+        # 写出输出（有缓存时write_limb会尝试使用缓存）
+        self.write_limb(N, l)
             
         return result
 
@@ -514,8 +608,7 @@ class MemoryTracker:
         result = self.asic.add_plain(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
         # 写出输出
         self.write_limb(N, l)
@@ -531,8 +624,7 @@ class MemoryTracker:
         result = self.asic.mod_up(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
         # 写出输出
         self.write_limb(N, l + 1)  # 模数提升后增加一个limb
@@ -548,8 +640,7 @@ class MemoryTracker:
         result = self.asic.mod_down(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
         # 写出输出
         self.write_limb(N, l - 1)  # 模数降低后减少一个limb
@@ -565,8 +656,7 @@ class MemoryTracker:
         result = self.asic.ntt(N, E, l, R, r, NUM, inner)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
         # 写出输出
         self.write_limb(N, l)
@@ -578,101 +668,96 @@ class MemoryTracker:
         alpha = math.ceil(l / self.dnum)
         DNUM = l
         
-        # 读取两个多项式（或从缓存中获取）
-        self.read_limb(N, l * 2)
-        
-        # 跟踪multiply_pe的内存
-        t1 = self.multiply_pe_with_memory(N, E, l, R, r, NUM)
-        
-        # 跟踪ntt的内存
-        t2 = self.ntt_with_memory(N, E, l, R, r, NUM, inner=(r*(r+1)/2))
-        
-        # 跟踪mod_up的内存
-        t3 = self.mod_up_with_memory(N, E, l, R, r, NUM, inner=DNUM*(r*(r+1)/2))
-        
-        # 跟踪ntt的内存
-        t4 = self.ntt_with_memory(N, E, l, R, r, NUM, inner=DNUM*(r*(r+1)/2))
-        
-        # 跟踪multiply_add的内存
-        t5 = self.multiply_add_with_memory(N, E, l, R, r, NUM*(r+1), inner=(r*(r+1)/2)*math.pow(4, R/r-1))*(DNUM+1)
-        
-        # 跟踪ntt的内存
-        t6 = self.ntt_with_memory(N, E, 1, R, r, NUM*(l+1)*(r+1), inner=1)
-        
-        # 跟踪mod_down的内存
-        t7 = self.mod_down_with_memory(N, E, l, R, r, NUM*(r+1), inner=1)
-        
-        # 跟踪ntt的内存
-        t8 = self.ntt_with_memory(N, E, l, R, r, NUM*(r+1), inner=1)
-        
-        # 跟踪add_plain的内存
-        t9 = self.add_plain_with_memory(N, E, l, R, r, NUM=NUM*(r+1))
-        
-        # 写出结果
-        self.write_limb(N, l)
+        # 整个multiply的内存事件序列（与各子操作的读写顺序一致），一次性记录
+        self.batch_account((
+            (N, l * 2, OP_READ_LIMB),                         # 读取两个多项式
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),      # multiply_pe
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),      # ntt
+            (N, l, OP_READ_LIMB), (N, l + 1, OP_WRITE_LIMB),  # mod_up
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),      # ntt
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),      # multiply_add
+            (N, 1, OP_READ_LIMB), (N, 1, OP_WRITE_LIMB),      # ntt
+            (N, l, OP_READ_LIMB), (N, l - 1, OP_WRITE_LIMB),  # mod_down
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),      # ntt
+            (N, l, OP_READ_LIMB), (N, 1, OP_READ_PLAIN),      # add_plain
+            (N, l, OP_WRITE_LIMB),
+            (N, l, OP_WRITE_LIMB),                            # 写出结果
+        ))
+        
+        # 每次调用只计算一次的公共因子；保持整数以避免inner计数变为浮点
+        half = (r * (r + 1)) // 2
+        pow4 = 4 ** (R // r - 1) if R % r == 0 else math.pow(4, R / r - 1)
+        NUM2 = NUM * (r + 1)
+        
+        # 各子操作的计算周期
+        # 注意ASIC.multiply将multiply_add的时间再乘以(DNUM+1)，这里与原跟踪逻辑一致只计入单次调用。
+        asic = self.asic
+        stats = self.stats
+        freq = self._freq
+        stats.computation_cycles += asic.multiply_pe(N, E, l, R, r, NUM, 1) * freq
+        stats.computation_cycles += asic.ntt(N, E, l, R, r, NUM, half) * freq
+        stats.computation_cycles += asic.mod_up(N, E, l, R, r, NUM, DNUM * half) * freq
+        stats.computation_cycles += asic.ntt(N, E, l, R, r, NUM, DNUM * half) * freq
+        stats.computation_cycles += asic.multiply_add(N, E, l, R, r, NUM2, half * pow4) * freq
+        stats.computation_cycles += asic.ntt(N, E, 1, R, r, NUM * (l + 1) * (r + 1), 1) * freq
+        stats.computation_cycles += asic.mod_down(N, E, l, R, r, NUM2, 1) * freq
+        stats.computation_cycles += asic.ntt(N, E, l, R, r, NUM2, 1) * freq
+        stats.computation_cycles += asic.add_plain(N, E, l, R, r, NUM2, 1) * freq
         
         # 调用原始函数获取正确的时间
-        result = self.asic.multiply(N, E, l, R, r, NUM)
+        result = asic.multiply(N, E, l, R, r, NUM)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        stats.computation_cycles += result * freq
         
         # 更新乘法时间并返回
-        self.asic.multiplytime += result
+        asic.multiplytime += result
         return result
 
     def rescale_with_memory(self, N, E, l, R, r, NUM=1):
         """为rescale添加内存跟踪"""
-        # 读取输入
-        self.read_limb(N, l)
-        
-        # 跟踪ntt的内存
-        t1 = self.ntt_with_memory(N, E, l, R, r, NUM*(r+1), inner=1)
-        
-        # 跟踪mod_down的内存
-        t2 = self.mod_down_with_memory(N, E, l-1, R, r, NUM*(r+1))
-        
-        # 跟踪ntt的内存
-        t3 = self.ntt_with_memory(N, E, l-1, R, r, NUM*(r+1), inner=1)
-        
-        # 写出输出
-        self.write_limb(N, l-1)  # rescale后减少一个limb
+        self.batch_account((
+            (N, l, OP_READ_LIMB),                                 # 读取输入
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),          # ntt
+            (N, l - 1, OP_READ_LIMB), (N, l - 2, OP_WRITE_LIMB),  # mod_down
+            (N, l - 1, OP_READ_LIMB), (N, l - 1, OP_WRITE_LIMB),  # ntt
+            (N, l - 1, OP_WRITE_LIMB),                            # 写出输出，rescale后减少一个limb
+        ))
+        
+        # 各子操作的计算周期
+        asic = self.asic
+        stats = self.stats
+        freq = self._freq
+        NUM2 = NUM * (r + 1)
+        stats.computation_cycles += asic.ntt(N, E, l, R, r, NUM2, 1) * freq
+        stats.computation_cycles += asic.mod_down(N, E, l - 1, R, r, NUM2, 1) * freq
+        stats.computation_cycles += asic.ntt(N, E, l - 1, R, r, NUM2, 1) * freq
         
         # 调用原始函数获取正确的时间
-        result = self.asic.rescale(N, E, l, R, r, NUM)
+        result = asic.rescale(N, E, l, R, r, NUM)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        stats.computation_cycles += result * freq
         
         return result
 
     def rotate_with_memory(self, N, E, l, R, r, NUM=1):
         """为rotate添加内存跟踪"""
-        # 读取输入和密钥
-        self.read_limb(N, l)
-        self.read_key(N, l+1)
-        
-        # 跟踪自同态内存操作
-        for i in range(2):  # 密文中的两个多项式
-            # 自同态操作
-            poly_addr = f"auto_poly_{i}_{id(self)}"
-            self.read_limb(N, l)
-            self.write_limb(N, l)
+        self.batch_account((
+            (N, l, OP_READ_LIMB), (N, l + 1, OP_READ_KEY),   # 读取输入和密钥
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),     # 密文中两个多项式的自同态操作
+            (N, l, OP_READ_LIMB), (N, l, OP_WRITE_LIMB),
+            (N, l, OP_WRITE_LIMB),                           # 写出输出
+        ))
         
         # 调用原始函数获取正确的时间
         result = self.asic.rotate(N, E, l, R, r, NUM)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
-        
-        # 写出输出
-        self.write_limb(N, l)
+        self.stats.computation_cycles += result * self._freq
         
         # 更新rotate时间并返回
-        self.asic.Rotatetime += result
+        self.asic.add_rotate_time(result)
         return result
 
     def keyswitch_with_memory(self, N, E, l, R, r, NUM=1):
@@ -685,8 +770,7 @@ class MemoryTracker:
         result = self.asic.keyswitch(N, E, l, R, r, NUM)
         
         # 更新计算周期统计
-        computation_cycles = result * self.frequency
-        self.stats.computation_cycles += computation_cycles
+        self.stats.computation_cycles += result * self._freq
         
         # 写出输出
         self.write_limb(N, l)
@@ -698,12 +782,24 @@ class MemoryTracker:
         """获取内存统计信息"""
         return self.stats
 
+    def flush_cache(self) -> int:
+        """写回缓存中的全部脏行（不计入统计），返回写回DRAM的字节数"""
+        return self.cache.flush() if self._is_cached else 0
+    
+    def discard_cache(self):
+        """丢弃缓存内容（脏行不写回、不计入统计），下一次运行与新建的跟踪器一样从空缓存开始"""
+        self.cache.clear()
+        self.cached_data = {}
+    
     def reset_stats(self):
         """重置内存统计信息"""
-        self.stats = MemoryStats(max_cache_size=self.max_cache_size, cache_style=self.cache_style)
+        # 分配新的统计对象，之前返回的结果不受后续运行影响
+        self.stats = MemoryStats(max_cache_size=self.stats.max_cache_size,
+                                 cache_style=self.stats.cache_style)
+        self.cache.stats = self.stats
         self.cached_data = {}  # 清除缓存数据跟踪
         
-        # 刷新并清空缓存
-        if self.cache_style != CacheStyle.NONE:
-            bytes_written = self.cache.clear()
+        # 写回脏行，并通过递增代数使缓存行惰性失效
+        if self._is_cached:
+            bytes_written = self.cache.reset()
             self.stats.dram_limb_wr += bytes_written
\ No newline at end of file
@@ -1,18 +1,210 @@
 import math
+import functools
+import contextlib
+
+
+# 各操作的纯计算内核：只依赖数值参数（PE_R与F也作为参数传入），结果按参数缓存。
+# 内核统一返回 (MMtime增量, MAtime增量, NTTtime增量, 时间)，由ASIC的同名方法一次性累加。
+# g类分组数已是整数，只对含浮点的表达式（acc_2*acc_4、log2、r）调用math.ceil。
+
+def cdiv(a, b):
+    """向上取整除法 ceil(a/b)，整数输入时不经过浮点"""
+    return -(-a // b)
+
+
+@functools.lru_cache(maxsize=None)
+def _log2_NR(N, R):
+    """NTT级数 log2(N/R)"""
+    return math.log2(N/R)
+
+
+@functools.lru_cache(maxsize=None)
+def _acc(PE_R, R, r):
+    """返回 (acc_2, acc_4)，即 2^(PE_R/R-1) 与 4^(R/r-1)"""
+    return 2 ** (PE_R / R - 1), 4 ** (R / r - 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _multiply_pe_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    N1 = N / PE_R
+    acc_2, acc_4 = _acc(PE_R, R, r)
+    g = math.ceil(N1/(E * acc_2 * acc_4))
+    mm = (g * l * inner + 3)*(PE_R + 1)*(PE_R + 1) / F * NUM
+    return mm, 0, 0, math.ceil(g * l + 3 + 2*r - 2) / F * NUM
+
+
+@functools.lru_cache(maxsize=None)
+def _multiply_add_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    N1 = N / PE_R
+    acc_2, acc_4 = _acc(PE_R, R, r)
+    g = math.ceil(N1 / (E * acc_2 * acc_4))
+    mm = (g * l + 3) * inner / F * NUM
+    ma = (g * l + 1) * inner / F * NUM
+    return mm, ma, 0, (g + 4 + 1) / F * NUM
+
+
+@functools.lru_cache(maxsize=None)
+def _add_plain_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    g = cdiv(N, R * 256)
+    ma = (g * l + 1) * inner / F * NUM
+    return 0, ma, 0, (g + 1) / F * NUM
+
+
+@functools.lru_cache(maxsize=None)
+def _mod_up_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    g = cdiv(N, R * E)
+    return 0, 0, 0, (g + 1) / F * NUM
+
+
+@functools.lru_cache(maxsize=None)
+def _mod_down_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    g = cdiv(N, R * 32)
+    g_up = cdiv(N, R * E)
+    ma = (g * l + 1) * inner / F * NUM
+    mm = (g * l + 3) * inner / F * NUM
+    # 先mod_up(与_mod_up_cost相同)再mod_down
+    return mm, ma, 0, (g_up + 1 + g * l + 4) / F * NUM
+
+
+@functools.lru_cache(maxsize=None)
+def _ntt_cost(N, E, l, R, r, NUM, inner, PE_R, F):
+    num = _log2_NR(N, R)
+    ntt = l * inner * num * N/R/256 * 5 / F * NUM
+    return 0, 0, ntt, math.ceil(num * 5) / F * NUM
+
+
+# multiply/keyswitch/rankred的融合闭式：子操作(ntt, mod_up, multiply_add, mod_down, add_plain)
+# 共用同一组 g 与 ntt 级数，逐项展开后合并为一次求和。记 NUM2 = NUM*(r+1)，NUM3 = NUM*(l+1)*(r+1)：
+#   MM  = multiply_pe + multiply_add(NUM2) + mod_down(NUM2)
+#   MA  = multiply_add(NUM2) + mod_down(NUM2) + add_plain(NUM2)
+#   NTT = ntt(l, NUM) + ntt(l, NUM, DNUM*inner) + ntt(1, NUM3) + ntt(l, NUM2)
+# mod_down内部的mod_up与mod_down使用相同的NUM。
+
+@functools.lru_cache(maxsize=None)
+def _multiply_cost(N, E, l, R, r, NUM, PE_R, F):
+    DNUM = l
+    half = r*(r+1) / 2
+    NUM2 = NUM*(r+1)
+    NUM3 = NUM*(l+1)*(r+1)
+    acc_2, acc_4 = _acc(PE_R, R, r)
+    g = math.ceil(N / PE_R / (E * acc_2 * acc_4))
+    g_up = cdiv(N, R * E)
+    g_down = cdiv(N, R * 32)
+    g_plain = cdiv(N, R * 256)
+    num = _log2_NR(N, R)
+    t_ntt = math.ceil(num * 5)
+    inner = half * acc_4
+    gl = g*l
+    gl_down = g_down*l
+    # 按NUM、NUM2、NUM3提取公因子
+    mm = ((gl + 3)*((PE_R + 1)*(PE_R + 1)*NUM + inner*NUM2) + (gl_down + 3)*NUM2) / F
+    ma = ((gl + 1)*inner + gl_down + g_plain*l + 2)*NUM2 / F
+    ntt = num * N/R/256 * 5 * (l*half*(DNUM + 1)*NUM + NUM3 + l*NUM2) / F
+    time = ((math.ceil(gl + 2*r + 1) + 2*t_ntt + g_up + 1)*NUM
+            + ((g + 5)*(DNUM+1) + g_up + gl_down + t_ntt + g_plain + 6)*NUM2
+            + t_ntt*NUM3) / F
+    return mm, ma, ntt, time
+
+
+@functools.lru_cache(maxsize=None)
+def _rescale_cost(N, E, l, R, r, NUM, PE_R, F):
+    _, _, ntt1, t1 = _ntt_cost(N, E, l, R, r, NUM*(r+1), 1, PE_R, F)
+    mm2, ma2, _, t2 = _mod_down_cost(N, E, l-1, R, r, NUM*(r+1), 1, PE_R, F)
+    _, _, ntt3, t3 = _ntt_cost(N, E, l-1, R, r, NUM*(r+1), 1, PE_R, F)
+    return mm2, ma2, ntt1 + ntt3, t1 + t2 + t3
+
+
+@functools.lru_cache(maxsize=None)
+def _rankred_cost(N, E, l, R, r, NUM, PE_R, F):
+    # rankred 即以 r/2 为参数的 keyswitch
+    return _keyswitch_cost(N, E, l, R, r/2, NUM, PE_R, F)
+
+
+@functools.lru_cache(maxsize=None)
+def _keyswitch_cost(N, E, l, R, r, NUM, PE_R, F):
+    DNUM = l
+    NUM2 = NUM*(r+1)
+    NUM3 = NUM*(l+1)*(r+1)
+    acc_2, acc_4 = _acc(PE_R, R, r)
+    g = math.ceil(N / PE_R / (E * acc_2 * acc_4))
+    g_up = cdiv(N, R * E)
+    g_down = cdiv(N, R * 32)
+    g_plain = cdiv(N, R * 256)
+    num = _log2_NR(N, R)
+    t_ntt = math.ceil(num * 5)
+    inner = r * acc_4 * (DNUM+1)
+    gl = g*l
+    gl_down = g_down*l
+    # 按NUM、NUM2、NUM3提取公因子
+    mm = ((gl + 3)*inner + gl_down + 3)*NUM2 / F
+    ma = ((gl + 1)*inner + gl_down + g_plain*l + 2)*NUM2 / F
+    ntt = num * N/R/256 * 5 * (l*r*(DNUM + 1)*NUM + NUM3 + l*NUM2) / F
+    time = ((gl - g + 2*t_ntt + g_up + 1)*NUM
+            + (g + g_up + gl_down + t_ntt + g_plain + 11)*NUM2
+            + t_ntt*NUM3) / F
+    return mm, ma, ntt, time
+
+
+@functools.lru_cache(maxsize=None)
+def _rotate_cost(N, E, l, R, r, NUM, PE_R, F):
+    """返回 (Rotatetime增量, MMtime增量, MAtime增量, NTTtime增量, 时间)"""
+    N1 = N/R
+    g = N1/E
+    rot = math.ceil(g*l + 3 + 1) / F * NUM
+    mm, ma, ntt, time = _keyswitch_cost(N, E, l, R, r, NUM, PE_R, F)
+    return rot, mm, ma, ntt, rot + time
+
+
+# multiply代价的特化模板：与_multiply_cost相同的表达式，只依赖(N, E, R, PE_R, F)的部分折叠为字面量
+_MULTIPLY_TEMPLATE = """
+def multiply_cost(l, r, NUM):
+    DNUM = l
+    half = r*(r+1) / 2
+    NUM2 = NUM*(r+1)
+    NUM3 = NUM*(l+1)*(r+1)
+    acc_4 = 4 ** ({R!r} / r - 1)
+    g = math.ceil({N1!r} / ({E_acc_2!r} * acc_4))
+    inner = half * acc_4
+    gl = g*l
+    gl_down = {g_down!r}*l
+    mm = ((gl + 3)*({pe_sq!r}*NUM + inner*NUM2) + (gl_down + 3)*NUM2) / {F!r}
+    ma = ((gl + 1)*inner + gl_down + {g_plain!r}*l + 2)*NUM2 / {F!r}
+    ntt = {ntt_unit!r} * (l*half*(DNUM + 1)*NUM + NUM3 + l*NUM2) / {F!r}
+    time = ((math.ceil(gl + 2*r + 1) + {t_up!r})*NUM
+            + ((g + 5)*(DNUM+1) + gl_down + {t_down!r})*NUM2
+            + {t_ntt!r}*NUM3) / {F!r}
+    return mm, ma, ntt, time
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def make_multiply_cost(N, E, R, PE_R, F):
+    """生成(N, E, R, PE_R, F)固定时的multiply代价函数 f(l, r, NUM)，返回值同_multiply_cost"""
+    acc_2 = 2 ** (PE_R / R - 1)
+    num = _log2_NR(N, R)
+    t_ntt = math.ceil(num * 5)
+    g_up = cdiv(N, R * E)
+    g_plain = cdiv(N, R * 256)
+    src = _MULTIPLY_TEMPLATE.format(
+        R=R, N1=N / PE_R, E_acc_2=E * acc_2, g_down=cdiv(N, R * 32), pe_sq=(PE_R + 1)*(PE_R + 1),
+        g_plain=g_plain, F=F, ntt_unit=num * N/R/256 * 5, t_ntt=t_ntt,
+        t_up=2*t_ntt + g_up + 1, t_down=g_up + t_ntt + g_plain + 6)
+    namespace = {}
+    exec(src, {"math": math}, namespace)
+    return functools.lru_cache(maxsize=None)(namespace["multiply_cost"])
 
 
 class ASIC:
-    F = 10 ** 9
+    # F、PE_R与各时间累加器为实例槽位；带宽和能量系数不在热路径上，保留为类属性
+    __slots__ = ("c_id", "F", "PE_R",
+                 "MMtime", "MAtime", "NTTtime", "NTT_time", "Rotatetime", "Keyswitchtime", "Relineartime",
+                 "multiplytime", "rankredtime", "Sdtime", "Rvtime", "Comtime",
+                 "NTT_Energy", "MM_Energy", "MA_Energy", "Auto_Energy",
+                 "_spec_key", "_multiply_spec")
+
     BD = 2048    # Gb/s
     m_bits = 20
-    PE_R = 8
-
-    MMtime = 0
-    MAtime = 0
-    Keyswitchtime = 0
-    Relineartime = 0
-    Rotatetime = 0
-    NTT_time = 0
+
     # Sdtime = 0
     # Rvtime = 0
     # Comtime = 0
@@ -30,154 +222,156 @@ class ASIC:
 
     def __init__(self, id):
         self.c_id = id
+        self.F = 10 ** 9
+        self.PE_R = 8
         self.MMtime = 0
         self.MAtime = 0
+        self.Keyswitchtime = 0
+        self.Relineartime = 0
+        self.Rotatetime = 0
+        self.NTT_time = 0
         self.multiplytime = 0
         self.rankredtime = 0
         self.NTTtime = 0
         self.Sdtime = 0
         self.Rvtime = 0
         self.Comtime = 0
+        # 能量随时间累加器增量同步累计，Energy()直接读取
+        self.NTT_Energy = 0.0
+        self.MM_Energy = 0.0
+        self.MA_Energy = 0.0
+        self.Auto_Energy = 0.0
+        # 由specialize()安装的特化multiply代价函数及其(N, E, R, PE_R, F)
+        self._spec_key = None
+        self._multiply_spec = None
         return
 
+    def specialize(self, N, E, R):
+        """为固定的(N, E, R)及当前PE_R、F安装特化的multiply代价函数，其他参数仍走通用内核
+
+        PE_R与F被固化在特化函数中，二者改变后multiply自动回到通用内核。
+        """
+        self._spec_key = (N, E, R, self.PE_R, self.F)
+        self._multiply_spec = make_multiply_cost(N, E, R, self.PE_R, self.F)
+
+    @contextlib.contextmanager
+    def specialized(self, N, E, R):
+        """在with块内使用特化的multiply，退出时恢复之前的特化状态"""
+        saved = self._spec_key, self._multiply_spec
+        self.specialize(N, E, R)
+        try:
+            yield self
+        finally:
+            self._spec_key, self._multiply_spec = saved
+
+    def _apply(self, mm, ma, ntt):
+        """一次性累加一个操作的MM/MA/NTT时间增量及对应能量"""
+        self.MMtime += mm
+        self.MAtime += ma
+        self.NTTtime += ntt
+        self.MM_Energy += mm * self.P_MM
+        self.MA_Energy += ma * self.P_MA
+        self.NTT_Energy += ntt * self.P_NTT
+
+    def add_rotate_time(self, rot):
+        """累加自同态时间及对应的Auto能量，外部对Rotatetime的更新都应经过这里"""
+        self.Rotatetime += rot
+        self.Auto_Energy += rot * self.P_Auto
+
+    def reset_rotate_time(self):
+        """清零自同态时间及对应的Auto能量"""
+        self.Rotatetime = 0
+        self.Auto_Energy = 0.0
+
     # MMtimepe单元顺序计算l个RNS时间，MM完整时间要*self.PE_R^2
     # 模加时间+1，r个延后2r-2
     def multiply_pe(self, N, E, l, R, r, NUM=1, inner=1):
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r - 1)
-        g = math.ceil(N1/(E * acc_2 * acc_4))
-        self.MMtime += (g * l * inner + 3)*math.pow(self.PE_R + 1, 2) / self.F * NUM
-        return math.ceil(g * l + 3 + 2*r - 2) / self.F * NUM
+        mm, ma, ntt, time = _multiply_pe_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
+        return time
 
     # 乘累加 乘3 加1 r*(r+1)/2间加法1 总共 5
     def multiply_add(self, N, E, l, R, r, NUM=1, inner=1):
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r - 1)
-        g = math.ceil(N1 / (E * acc_2 * acc_4))
-        self.MMtime += (g * l + 3) * inner / self.F * NUM
-        self.MAtime += (g * l + 1) * inner / self.F * NUM
-        return math.ceil(g + 4 + 1) / self.F * NUM
+        mm, ma, ntt, time = _multiply_add_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
+        return time
 
     def add_plain(self, N, E, l, R, r, NUM=1, inner=1):
-        g = math.ceil(N / R / 256)
-        self.MAtime += (g * l + 1) * inner / self.F * NUM
-        return math.ceil(g + 1) / self.F * NUM
+        mm, ma, ntt, time = _add_plain_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
+        return time
 
     def mod_up(self, N, E, l, R, r, NUM=1, inner=1): # need to check
-        # N1 = N / self.PE_R
-        # acc_2 = math.pow(2, self.PE_R / R - 1)
-        # acc_4 = math.pow(4, R / r - 1)
-        # g = math.ceil(N1 / (E * acc_2 * acc_4))
-        g = math.ceil(N / R / E)
-        return math.ceil(g + 1) / self.F * NUM
+        return _mod_up_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)[3]
 
     def mod_down(self, N, E, l, R, r, NUM=1, inner=1): # need to check
-        # N1 = N / self.PE_R
-        # acc_2 = math.pow(2, self.PE_R / R - 1)
-        # acc_4 = math.pow(4, R / r - 1)
-        g = math.ceil(N/R / 32)
-        self.MAtime += (g * l + 1) * inner / self.F * NUM
-        self.MMtime += (g * l + 3) * inner / self.F * NUM
-        return self.mod_up(N, E, l, R, NUM, inner) + math.ceil(g * l + 4) / self.F * NUM
+        mm, ma, ntt, time = _mod_down_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
+        return time
 
     def ntt(self, N, E, l, R, r, NUM=1, inner=1): # need to check
-        time = 0
-        num = math.log2(N/R)
-        time += l * inner * num * N/R/256 * 5 / self.F * NUM
-        self.NTTtime += time
-        return math.ceil(num * 5) / self.F * NUM
+        mm, ma, ntt, time = _ntt_cost(N, E, l, R, r, NUM, inner, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
+        return time
 
     def multiply(self, N, E, l, R, r, NUM=1):
-        alpha = 1
-        DNUM = l
-        time = self.multiply_pe(N, E, l, R, r, NUM) + \
-               self.ntt(N, E, l, R, r, NUM, inner = (r*(r+1) / 2)) + \
-               self.mod_up(N, E, l, R, r, NUM, inner=DNUM*(r*(r+1) / 2)) + \
-               self.ntt(N, E, l, R, r, NUM, inner=DNUM*(r*(r+1) / 2)) + \
-               self.multiply_add(N, E, l, R, r, NUM*(r+1), inner=(r*(r+1)/2)*math.pow(4, R / r - 1))*(DNUM+1) + \
-               self.ntt(N, E, 1, R, r, NUM*(l+1)*(r+1), inner=1) + \
-               self.mod_down(N, E, l, R, r, NUM*(r+1), inner=1) + \
-               self.ntt(N, E, l, R, r, NUM*(r+1), inner=1) + \
-               self.add_plain(N, E, l, R, r, NUM=NUM * (r + 1))
+        if self._spec_key == (N, E, R, self.PE_R, self.F):
+            mm, ma, ntt, time = self._multiply_spec(l, r, NUM)
+        else:
+            mm, ma, ntt, time = _multiply_cost(N, E, l, R, r, NUM, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
         self.multiplytime += time
         return time
         # return 1 / 0.48 * NUM * inner
 
     # 并行l个INTT时间 + (l-1)个分别ModDown + 并行的l个NTT 进行r+1次
     def rescale(self, N, E, l, R, r, NUM=1):
-        time = self.ntt(N, E, l, R, r, NUM*(r+1), inner=1) + \
-               self.mod_down(N, E, l-1, R, r, NUM*(r+1)) + \
-               self.ntt(N, E, l-1, R, r, NUM*(r+1), inner=1)
+        mm, ma, ntt, time = _rescale_cost(N, E, l, R, r, NUM, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
         return time
 
     def rankred(self, N, E, l, R, r, NUM=1):
-        alpha = 1
-        DNUM = l
-        r1 = r/2
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r1 - 1)
-        g = math.ceil(N1 / (E * acc_2 * acc_4))
-        time = math.ceil(g*(l-1)) / self.F * NUM + \
-               self.ntt(N, E, l, R, r1, NUM, inner=r1) + \
-               self.mod_up(N, E, l, R, r1, NUM, inner=DNUM * r1) + \
-               self.ntt(N, E, l, R, r1, NUM, inner=DNUM * r1) + \
-               self.multiply_add(N, E, l, R, r1, NUM * (r1 + 1), inner=(r1*math.pow(4, R / r1 - 1))*(DNUM+1)) + \
-               self.ntt(N, E, 1, R, r1, NUM * (l+1) * (r1 + 1), inner=1) + \
-               self.mod_down(N, E, l, R, r1, NUM * (r1 + 1), inner=1) + \
-               self.ntt(N, E, l, R, r1, NUM * (r1 + 1), inner=1) + \
-               self.add_plain(N, E, l, R, r1, NUM=NUM * (r1 + 1))
+        mm, ma, ntt, time = _rankred_cost(N, E, l, R, r, NUM, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
         self.rankredtime += time
         return time
 
     def keyswitch(self, N, E, l, R, r, NUM=1):
-        alpha = 1
-        DNUM = l
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r - 1)
-        g = math.ceil(N1 / (E * acc_2 * acc_4))
-        time = math.ceil(g * (l - 1)) / self.F * NUM + \
-               self.ntt(N, E, l, R, r, NUM, inner=r) + \
-               self.mod_up(N, E, l, R, r, NUM, inner=DNUM * r) + \
-               self.ntt(N, E, l, R, r, NUM, inner=DNUM * r) + \
-               self.multiply_add(N, E, l, R, r, NUM * (r + 1), inner=(r * math.pow(4, R / r - 1)) * (DNUM + 1)) + \
-               self.ntt(N, E, 1, R, r, NUM * (l + 1) * (r + 1), inner=1) + \
-               self.mod_down(N, E, l, R, r, NUM * (r + 1), inner=1) + \
-               self.ntt(N, E, l, R, r, NUM * (r + 1), inner=1) + \
-               self.add_plain(N, E, l, R, r, NUM=NUM * (r + 1))
+        mm, ma, ntt, time = _keyswitch_cost(N, E, l, R, r, NUM, self.PE_R, self.F)
+        self._apply(mm, ma, ntt)
         return time
 
     def rotate(self, N, E, l, R, r, NUM=1):
-        N1 = N/R
-        g = N1/E
-        time = math.ceil(g*l + 3 + 1) / self.F * NUM
-        self.Rotatetime += time
-        return time + self.keyswitch(N, E, l, R, r, NUM)
+        rot, mm, ma, ntt, time = _rotate_cost(N, E, l, R, r, NUM, self.PE_R, self.F)
+        self.add_rotate_time(rot)
+        self._apply(mm, ma, ntt)
+        return time
 
     def multiply_constant(self, N, E, l, R, r, NUM=1, inner=1):
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r - 1)
+        PE_R = self.PE_R
+        F = self.F
+        N1 = N / PE_R
+        acc_2, acc_4 = _acc(PE_R, R, r)
         g = math.ceil(N1 / (E * acc_2 * acc_4))
-        self.MMtime += (g * l * inner + 3) * r * math.pow(4, R / r - 1) / self.F * NUM
-        return math.ceil(g * l * inner + 3) / self.F * NUM
+        mm = (g * l * inner + 3) * r * acc_4 / F * NUM
+        self._apply(mm, 0, 0)
+        return math.ceil(g * l * inner + 3) / F * NUM
 
     def add_constant(self, N, E, l, R, r, NUM=1, inner=1):
-        N1 = N / self.PE_R
-        acc_2 = math.pow(2, self.PE_R / R - 1)
-        acc_4 = math.pow(4, R / r - 1)
+        PE_R = self.PE_R
+        F = self.F
+        N1 = N / PE_R
+        acc_2, acc_4 = _acc(PE_R, R, r)
         g = math.ceil(N1 / (E * acc_2 * acc_4))
-        self.MAtime += (g * l * inner + 1) * r * math.pow(4, R / r - 1) / self.F * NUM
-        return math.ceil(g * l * inner + 1) / self.F * NUM
+        ma = (g * l * inner + 1) * r * acc_4 / F * NUM
+        self._apply(0, ma, 0)
+        return math.ceil(g * l * inner + 1) / F * NUM
 
     def Energy(self):
-        NTT_Energy = self.NTTtime * self.P_NTT
-        MM_Energy = self.MMtime * self.P_MM
-        MA_Energy = self.MAtime * self.P_MA
-        Auto_Energy = self.Rotatetime * self.P_Auto
+        NTT_Energy = self.NTT_Energy
+        MM_Energy = self.MM_Energy
+        MA_Energy = self.MA_Energy
+        Auto_Energy = self.Auto_Energy
         total = NTT_Energy + MM_Energy + MA_Energy + Auto_Energy
         # print("cid  ", self.c_id)
         # print("Energy")
@@ -6,8 +6,13 @@ import sys
 import math
 from MemoryTracker import CacheStyle, MemoryTracker
 from MemoryConfig import MemoryConfig, SimulationRunner
+from output_utils import buffered_output
 import ModHE
 
+# 缓存风格比较表的行格式
+ROW_FMT = "{:<15}{:<15.2f}{:<18.2f}{:<18.2f}{:<15.2f}{:<15.2f}{:<15.2f}"
+
+@buffered_output
 def demo_simple_operation():
     """演示简单的内存跟踪"""
     print("演示: 简单内存跟踪")
@@ -59,6 +64,7 @@ def demo_simple_operation():
     original_result = asic.multiply(N, E, l, R, r)
     print(f"原始时间: {original_result:.2f} 周期")
 
+@buffered_output
 def demo_cache_comparison():
     """演示比较不同的缓存风格"""
     print("\n演示: 缓存风格比较")
@@ -109,12 +115,12 @@ def demo_cache_comparison():
             cache_mb = 0.0
             efficiency = 0.0
             
-        print(f"{config.cache_style.name:<15}{result['time']:<15.2f}"
-              f"{result['compute_time']:<18.2f}{result['dram_latency']:<18.2f}"
-              f"{stats.total_dram_transfers / (1024**2):<15.2f}"
-              f"{cache_mb:<15.2f}"
-              f"{efficiency:<15.2f}")
+        print(ROW_FMT.format(config.cache_style.name, result['time'],
+                             result['compute_time'], result['dram_latency'],
+                             stats.total_dram_transfers / (1024**2),
+                             cache_mb, efficiency))
 
+@buffered_output
 def demo_keyswitching():
     """演示密钥切换操作"""
     print("\n演示: 密钥切换操作")
@@ -0,0 +1,19 @@
+"""
+脚本共用的输出辅助函数
+"""
+import sys
+import io
+import functools
+import contextlib
+
+def buffered_output(func):
+    """缓冲函数内的全部print输出，结束时一次性写入stdout"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+    return wrapper
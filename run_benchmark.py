@@ -3,20 +3,28 @@
 ModHE内存模拟的基准测试脚本
 """
 import sys
-import math
 from datetime import datetime
 from MemoryTracker import CacheStyle, MemoryTracker
 from MemoryConfig import MemoryConfig, SimulationRunner
+from output_utils import buffered_output
+
+# 表格行格式，预先定义以避免每行重复解析格式说明
+OP_ROW_FMT = "{:<10}{:<15.2f}{:<20}{:<20}{:<20}"
+STYLE_ROW_FMT = "{:<15}{:<15.2f}{:<20}{:<20}"
+DETAIL_ROW_FMT = "{:<10}{:<15.2f}{:<18.2f}{:<18.2f}{:<15.2f}{:<15}"
+DETAIL_HIT_ROW_FMT = "{:<10}{:<15.2f}{:<18.2f}{:<18.2f}{:<15.2f}{:<15.2f}%"
+
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+_SIZE_DIVS = (1, 1024, 1024**2, 1024**3, 1024**4)
 
 def format_bytes(size_bytes):
     """将字节格式化为人类可读的大小"""
     if size_bytes == 0:
         return "0 B"
-    size_name = ("B", "KB", "MB", "GB", "TB")
-    i = int(math.floor(math.log(size_bytes, 1024)))
-    p = math.pow(1024, i)
-    s = round(size_bytes / p, 2)
-    return f"{s} {size_name[i]}"
+    # floor(log1024(n)) 即 (bit_length-1)//10
+    i = min((int(size_bytes).bit_length() - 1) // 10, 4)
+    s = round(size_bytes / _SIZE_DIVS[i], 2)
+    return f"{s} {_SIZE_NAMES[i]}"
 
 def print_divider():
     """打印分隔线"""
@@ -28,8 +36,9 @@ def print_header(title):
     print(f" {title} ".center(80, "="))
     print_divider()
 
-def run_operation_benchmarks(runner, config, operation, N, E, l_values, R, r):
-    """对不同的l值运行基准测试"""
+@buffered_output
+def run_operation_benchmarks(runner, config, operation, N, E, l_values, R, r, workers=None):
+    """对不同的l值运行基准测试（workers > 1 时并行运行）"""
     print_header(f"使用{config.cache_style.name}缓存对{operation}进行基准测试")
     print(f"缓存大小: {format_bytes(config.max_cache_bytes)}")
     print(f"参数: N={N}, E={E}, R={R}, r={r}")
@@ -40,22 +49,19 @@ def run_operation_benchmarks(runner, config, operation, N, E, l_values, R, r):
     
     runner.configure(config)
     
-    for l in l_values:
-        result = runner.run_benchmark(operation, N, E, l, R, r)
+    for l, result in runner.run_sweep(operation, N, E, l_values, R, r, workers=workers):
         stats = result["memory_stats"]
         
-        print(f"{l:<10}{result['time']:<15.2f}{format_bytes(stats.dram_limb_rd):<20}"
-              f"{format_bytes(stats.dram_limb_wr):<20}{format_bytes(stats.total_dram_transfers):<20}")
+        print(OP_ROW_FMT.format(l, result['time'], format_bytes(stats.dram_limb_rd),
+                                format_bytes(stats.dram_limb_wr), format_bytes(stats.total_dram_transfers)))
     
     print_divider()
 
+@buffered_output
 def compare_cache_styles(N=2**16, E=1024, l=16, R=8, r=2):
     """比较不同缓存风格的操作"""
     print_header("缓存风格比较")
     
-    runner = SimulationRunner()
-    runner.dnum = 2  # 设置dnum参数
-    
     cache_configs = [
         MemoryConfig(cache_style=CacheStyle.NONE, max_cache_size_mb=0),
         MemoryConfig(cache_style=CacheStyle.CONST, max_cache_size_mb=1),
@@ -64,6 +70,14 @@ def compare_cache_styles(N=2**16, E=1024, l=16, R=8, r=2):
         MemoryConfig(cache_style=CacheStyle.HUGE, max_cache_size_mb=250)
     ]
     
+    # 每种缓存风格一个预先配置的运行器，所有操作复用
+    runners = {}
+    for config in cache_configs:
+        runner = SimulationRunner()
+        runner.dnum = 2  # 设置dnum参数
+        runner.configure(config)
+        runners[config.cache_style] = runner
+    
     operations = ["multiply", "rotate", "keyswitch"]
     
     for operation in operations:
@@ -71,14 +85,19 @@ def compare_cache_styles(N=2**16, E=1024, l=16, R=8, r=2):
         print(f"{'缓存风格':<15}{'时间 (周期)':<15}{'DRAM传输':<20}{'最大缓存使用':<20}")
         print_divider()
         
+        # 每个缓存配置只运行一次，两张表共用结果
+        results = {}
         for config in cache_configs:
-            runner.configure(config)
-            result = runner.run_benchmark(operation, N, E, l, R, r)
+            runner = runners[config.cache_style]
+            # 丢弃上一操作遗留的缓存内容，使各操作与全新配置时一样相互独立
+            runner.tracker.discard_cache()
+            result = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+            results[config.cache_style] = result
             stats = result["memory_stats"]
             
-            print(f"{config.cache_style.name:<15}{result['time']:<15.2f}"
-                  f"{format_bytes(stats.total_dram_transfers):<20}"
-                  f"{format_bytes(stats.max_cache_usage):<20}")
+            print(STYLE_ROW_FMT.format(config.cache_style.name, result['time'],
+                                       format_bytes(stats.total_dram_transfers),
+                                       format_bytes(stats.max_cache_usage)))
         
         print_divider()
         print()
@@ -91,31 +110,30 @@ def compare_cache_styles(N=2**16, E=1024, l=16, R=8, r=2):
         print(f"{'缓存风格':<10}{'总时间 (周期)':<15}{'计算时间 (周期)':<18}{'内存时间 (周期)':<18}{'DRAM传输 (MB)':<15}{'缓存命中率':<15}")
         print("-" * 100)
         
-        # 为每个测试单独配置和运行基准测试，以获得独立的统计数据
-        runner.configure(MemoryConfig(cache_style=CacheStyle.NONE, max_cache_size_mb=0))
-        result_none = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+        result_none = results[CacheStyle.NONE]
         stats_none = result_none["memory_stats"]
-        print(f"NONE{'':<6}{result_none['time']:<15.2f}{result_none['compute_time']:<18.2f}{result_none['memory_time']:<18.2f}{stats_none.total_dram_transfers / (1024**2):<15.2f}{'N/A':<15}")
+        print(DETAIL_ROW_FMT.format("NONE", result_none['time'], result_none['compute_time'], result_none['memory_time'],
+                                    stats_none.total_dram_transfers / (1024**2), 'N/A'))
         
-        runner.configure(MemoryConfig(cache_style=CacheStyle.CONST, max_cache_size_mb=1))
-        result_const = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+        result_const = results[CacheStyle.CONST]
         stats_const = result_const["memory_stats"]
-        print(f"CONST{'':<5}{result_const['time']:<15.2f}{result_const['compute_time']:<18.2f}{result_const['memory_time']:<18.2f}{stats_const.total_dram_transfers / (1024**2):<15.2f}{result_const['cache_hit_rate']*100:<15.2f}%")
+        print(DETAIL_HIT_ROW_FMT.format("CONST", result_const['time'], result_const['compute_time'], result_const['memory_time'],
+                                        stats_const.total_dram_transfers / (1024**2), result_const['cache_hit_rate']*100))
         
-        runner.configure(MemoryConfig(cache_style=CacheStyle.BETA, max_cache_size_mb=4))
-        result_beta = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+        result_beta = results[CacheStyle.BETA]
         stats_beta = result_beta["memory_stats"]
-        print(f"BETA{'':<6}{result_beta['time']:<15.2f}{result_beta['compute_time']:<18.2f}{result_beta['memory_time']:<18.2f}{stats_beta.total_dram_transfers / (1024**2):<15.2f}{result_beta['cache_hit_rate']*100:<15.2f}%")
+        print(DETAIL_HIT_ROW_FMT.format("BETA", result_beta['time'], result_beta['compute_time'], result_beta['memory_time'],
+                                        stats_beta.total_dram_transfers / (1024**2), result_beta['cache_hit_rate']*100))
         
-        runner.configure(MemoryConfig(cache_style=CacheStyle.ALPHA, max_cache_size_mb=16))
-        result_alpha = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+        result_alpha = results[CacheStyle.ALPHA]
         stats_alpha = result_alpha["memory_stats"]
-        print(f"ALPHA{'':<5}{result_alpha['time']:<15.2f}{result_alpha['compute_time']:<18.2f}{result_alpha['memory_time']:<18.2f}{stats_alpha.total_dram_transfers / (1024**2):<15.2f}{result_alpha['cache_hit_rate']*100:<15.2f}%")
+        print(DETAIL_HIT_ROW_FMT.format("ALPHA", result_alpha['time'], result_alpha['compute_time'], result_alpha['memory_time'],
+                                        stats_alpha.total_dram_transfers / (1024**2), result_alpha['cache_hit_rate']*100))
         
-        runner.configure(MemoryConfig(cache_style=CacheStyle.HUGE, max_cache_size_mb=250))
-        result_huge = runner.run_benchmark(operation, N, E, l, R, r, reset_stats=True)
+        result_huge = results[CacheStyle.HUGE]
         stats_huge = result_huge["memory_stats"]
-        print(f"HUGE{'':<6}{result_huge['time']:<15.2f}{result_huge['compute_time']:<18.2f}{result_huge['memory_time']:<18.2f}{stats_huge.total_dram_transfers / (1024**2):<15.2f}{result_huge['cache_hit_rate']*100:<15.2f}%")
+        print(DETAIL_HIT_ROW_FMT.format("HUGE", result_huge['time'], result_huge['compute_time'], result_huge['memory_time'],
+                                        stats_huge.total_dram_transfers / (1024**2), result_huge['cache_hit_rate']*100))
         
         print()
         
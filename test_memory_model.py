@@ -0,0 +1,162 @@
+"""内存模型的回归检查，运行方式：python -m unittest test_memory_model"""
+import unittest
+
+import ModHE
+import MemoryTracker as tracker_module
+from MemoryConfig import MemoryConfig, SimulationRunner
+from MemoryTracker import CacheStyle, MemoryTracker
+
+# 与run_benchmark.py相同的参数：N=2^16, E=1024, l=16, R=8, r=2
+ARGS = (2**16, 1024, 16, 8, 2)
+
+
+def run(op, **config):
+    runner = SimulationRunner()
+    runner.configure(MemoryConfig(**config))
+    return runner.run_benchmark(op, *ARGS)
+
+
+class PrefetchTest(unittest.TestCase):
+    """软件预取只提前取之后真正读取的缓冲区：总流量不变，命中率上升"""
+
+    def check(self, cache_style, max_cache_size_mb):
+        base = run("multiply", cache_style=cache_style, max_cache_size_mb=max_cache_size_mb)
+        pref = run("multiply", cache_style=cache_style, max_cache_size_mb=max_cache_size_mb,
+                   prefetch_distance=2)
+        self.assertEqual(pref['memory_stats'].total_dram_transfers,
+                         base['memory_stats'].total_dram_transfers)
+        self.assertGreater(pref['cache_hit_rate'], base['cache_hit_rate'])
+        self.assertLess(pref['memory_stats'].memory_cycles, base['memory_stats'].memory_cycles)
+
+    def test_huge(self):
+        self.check(CacheStyle.HUGE, 250)
+
+    def test_alpha(self):
+        self.check(CacheStyle.ALPHA, 16)
+
+    def test_disabled_by_default(self):
+        base = run("multiply", cache_style=CacheStyle.HUGE, max_cache_size_mb=250)
+        off = run("multiply", cache_style=CacheStyle.HUGE, max_cache_size_mb=250,
+                  prefetch_distance=0)
+        self.assertEqual(off['memory_stats'].dram_limb_rd, base['memory_stats'].dram_limb_rd)
+        self.assertEqual(off['cache_hit_rate'], base['cache_hit_rate'])
+
+
+class ResultIsolationTest(unittest.TestCase):
+    """同一跟踪器连续运行时，先前返回的统计不被后续运行改写"""
+
+    def test_full_benchmark(self):
+        runner = SimulationRunner()
+        results = runner.run_full_benchmark(
+            MemoryConfig(cache_style=CacheStyle.ALPHA, max_cache_size_mb=16), *ARGS)
+        multiply = results["multiply"]["memory_stats"]
+        self.assertEqual(multiply.dram_limb_rd, 20070400)
+        self.assertEqual(multiply.total_accesses, 20)
+        self.assertIsNot(multiply, results["keyswitch"]["memory_stats"])
+
+
+class EnergyTest(unittest.TestCase):
+    """Energy()的累加值与按时间乘功率的原始公式一致"""
+
+    def test_matches_time_formula(self):
+        runner = SimulationRunner()
+        runner.run_full_benchmark(
+            MemoryConfig(cache_style=CacheStyle.ALPHA, max_cache_size_mb=16), *ARGS)
+        asic = runner.asic
+        expected = (asic.NTTtime * asic.P_NTT, asic.MMtime * asic.P_MM,
+                    asic.MAtime * asic.P_MA, asic.Rotatetime * asic.P_Auto)
+        for got, want in zip(runner.get_energy_report(), expected):
+            self.assertAlmostEqual(got, want, delta=1e-9 * want)
+        self.assertGreater(asic.Auto_Energy, 1e-5)
+
+
+class SpecializeTest(unittest.TestCase):
+    """特化的multiply只在参数完全匹配时使用，且run_sweep结束后不残留"""
+
+    def test_frequency_change_falls_back(self):
+        asic = ModHE.ASIC(0)
+        asic.specialize(2**16, 1024, 8)
+        asic.F = asic.F * 2
+        generic = ModHE.ASIC(0)
+        generic.F = asic.F
+        self.assertEqual(asic.multiply(2**16, 1024, 16, 8, 2),
+                         generic.multiply(2**16, 1024, 16, 8, 2))
+
+    def test_sweep_restores_state(self):
+        runner = SimulationRunner()
+        runner.configure(MemoryConfig(cache_style=CacheStyle.HUGE, max_cache_size_mb=250))
+        list(runner.run_sweep("multiply", 2**16, 1024, range(1, 5), 8, 2))
+        self.assertIsNone(runner.asic._spec_key)
+
+
+class DramLatencyTest(unittest.TestCase):
+    """修改延迟模型参数后立即生效"""
+
+    def test_bandwidth_change(self):
+        tracker = MemoryTracker(ModHE.ASIC(0))
+        before = tracker.calculate_dram_access_latency(2**21)
+        tracker.bandwidth /= 2
+        self.assertGreater(tracker.calculate_dram_access_latency(2**21), before)
+
+    def test_frequency_change_scales_compute_cycles(self):
+        tracker = MemoryTracker(ModHE.ASIC(0))
+        tracker.frequency = 2 * tracker.frequency
+        self.assertEqual(tracker._freq, tracker.frequency)
+
+
+class AddressKeyTest(unittest.TestCase):
+    """不同数据类型的地址键互不冲突，包括负的limbs（l=1时rescale写出l-2）"""
+
+    def test_no_collisions(self):
+        kinds = (tracker_module._LIMB, tracker_module._KEY, tracker_module._PLAIN)
+        keys = {tracker_module._address_key(kind, N, limbs)
+                for kind in kinds for N in (2**16, 2**17) for limbs in range(-2, 40)}
+        self.assertEqual(len(keys), 3 * 2 * 42)
+
+
+class SweepValidationTest(unittest.TestCase):
+    """run_sweep在调用时立即检查参数"""
+
+    def test_unknown_operation(self):
+        runner = SimulationRunner()
+        runner.configure(MemoryConfig())
+        with self.assertRaises(ValueError):
+            runner.run_sweep("bogus", 2**16, 1024, range(1, 5), 8, 2)
+
+    def test_unconfigured(self):
+        with self.assertRaises(ValueError):
+            SimulationRunner().run_sweep("multiply", 2**16, 1024, range(1, 5), 8, 2)
+
+
+class ParallelSweepTest(unittest.TestCase):
+    """并行扫描与串行扫描结果一致，包括configure之后修改的ASIC与跟踪器参数"""
+
+    def sweep(self, workers):
+        runner = SimulationRunner()
+        runner.configure(MemoryConfig(cache_style=CacheStyle.ALPHA, max_cache_size_mb=16))
+        runner.asic.F = 2e9
+        runner.tracker.logq = 60
+        runner.tracker.dnum = 4
+        rows = [(l, result["time"], result["cache_hit_rate"],
+                 result["memory_stats"].dram_limb_rd, result["memory_stats"].dram_limb_wr)
+                for l, result in runner.run_sweep("multiply", 2**16, 1024, range(4, 13, 4), 8, 2,
+                                                  workers=workers)]
+        return rows, runner.get_energy_report()
+
+    def test_matches_serial(self):
+        serial_rows, serial_energy = self.sweep(None)
+        parallel_rows, parallel_energy = self.sweep(2)
+        self.assertEqual(parallel_rows, serial_rows)
+        for got, want in zip(parallel_energy, serial_energy):
+            self.assertAlmostEqual(got, want, delta=1e-9 * want)
+
+    def test_requires_config(self):
+        runner = SimulationRunner()
+        runner.configure(MemoryConfig())
+        runner.config = None
+        with self.assertRaises(ValueError):
+            runner.run_sweep("multiply", 2**16, 1024, range(1, 5), 8, 2, workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()